@@ -6,11 +6,22 @@ Created on 2016年12月24日
 """
 
 import os
+import copy
+import tempfile
 import numbers
+import collections
 import abc
+import queue
+import threading
+import itertools
+import functools
+import importlib
+import contextlib
+import concurrent.futures
 
-import yaml
-import petl
+# imported on first use, see `_yaml()` and `_petl()`
+yaml = None
+petl = None
 
 
 __version__ = '2.0.0'
@@ -19,6 +30,20 @@ default_db_conf_path = os.path.join(os.path.expanduser("~"), 'dbconfig.yaml')
 default_db_label = '127.0.0.1'
 default_db_driver = 'pymysql'
 
+# parsed configuration files, absolute path -> ((st_mtime_ns, st_size), config), least recently used first
+_db_config_cache = collections.OrderedDict()
+_db_config_cache_size = 100
+# idle connections, keyed by (driver, frozenset(connect_kwargs.items()))
+_pools = {}
+_pools_lock = threading.Lock()
+# SQL literal formatters of the most common exact types, see `WriterInterface._to_q()`
+_sql_literals = {
+    type(None): lambda obj: 'NULL',
+    int: str,
+    float: str,
+    str: lambda obj: "'%s'" % obj.replace("'", "''"),
+}
+
 
 class BasicConfig:
     # default configuration file path
@@ -27,13 +52,19 @@ class BasicConfig:
     db_label = default_db_label
     # default package name of underlying database driver.
     driver = default_db_driver
+    # max number of idle connections kept per connection parameters, pooling is disabled if it's 0.
+    pool_size = 0
 
     @classmethod
-    def configure(cls, db_config=default_db_conf_path, db_label=default_db_label, driver=default_db_driver):
+    def configure(cls, db_config=default_db_conf_path, db_label=default_db_label, driver=default_db_driver,
+                  pool_size=0):
         """Does basic configuration for this module."""
         cls.db_config = db_config
         cls.db_label = db_label
         cls.driver = driver
+        if pool_size != cls.pool_size:
+            cls.pool_size = pool_size
+            _clear_pools()                          # existing pools are sized by the previous `pool_size`
 
     def __init__(self):
         raise NotImplementedError('can not initialize %s' % self.__class__)
@@ -51,15 +82,125 @@ def connect(driver=None, **connect_kwargs):
     """
 
     driver = driver or BasicConfig.driver
-    driver in globals() or globals().update({driver: __import__(driver)})
-    connection = globals()[driver].connect(**connect_kwargs)
+    connection = _load_driver(driver).connect(**connect_kwargs)
     return connection
 
 
+@functools.lru_cache(maxsize=None)
+def _load_driver(driver):
+    """import the package of underlying database driver once"""
+    return importlib.import_module(driver)
+
+
+def _yaml():
+    global yaml
+    if yaml is None:
+        import yaml
+    return yaml
+
+
+def _petl():
+    global petl
+    if petl is None:
+        import petl
+    return petl
+
+
+def _acquire(driver, connect_kwargs):
+    """take an idle connection from the pool if pooling is enabled, otherwise obtain a new connection.
+    :return (connection, pool key), the pool key is `None` if the connection can not be pooled.
+    """
+    key = None
+    if BasicConfig.pool_size > 0:
+        try:
+            key = (driver, frozenset(connect_kwargs.items()))
+        except TypeError:  # unhashable connection parameters can not be pooled
+            pass
+    if key is not None:
+        pool = _pools.get(key)
+        if pool is None:
+            with _pools_lock:
+                pool = _pools.setdefault(key, queue.LifoQueue(BasicConfig.pool_size))  # the most recently used first
+        while True:
+            try:
+                connection = pool.get_nowait()
+            except queue.Empty:
+                break
+            if _ping(connection):
+                return connection, key
+            _discard(connection)
+    return connect(driver, **connect_kwargs), key
+
+
+def _ping(connection):
+    """check whether an idle connection is still usable, pymysql/MySQLdb reconnect a dropped one"""
+    ping = getattr(connection, 'ping', None)
+    if ping is None:
+        return True
+    try:
+        ping(True)
+    except Exception:                               # each driver raises its own error class
+        return False
+    return True
+
+
+def _release(key, connection):
+    """rollback uncommitted work and return the connection to its pool,
+    close it if the pool is full or the pool key is `None`.
+    """
+    if key is None:
+        connection.close()
+        return
+    connection.rollback()
+    pool = _pools.get(key)                          # `None` if the pools were cleared meanwhile
+    if pool is not None:
+        try:
+            pool.put_nowait(connection)
+            return
+        except queue.Full:
+            pass
+    connection.close()
+
+
+def _clear_pools():
+    """close the idle connections of every pool and forget the pools"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        while True:
+            try:
+                connection = pool.get_nowait()
+            except queue.Empty:
+                break
+            _discard(connection)
+
+
+def _discard(connection):
+    """close a connection which is not used anymore, it may be broken already"""
+    try:
+        connection.close()
+    except Exception:                               # each driver raises its own error class
+        pass
+
+
 def load_db_config(db_config):
-    with open(db_config) as f:
-        config = yaml.safe_load(f)
-    return config
+    """parse a yaml configuration file, the result is cached until the file's mtime or size changes"""
+    path = os.path.abspath(db_config)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _db_config_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        config = cached[1]
+    else:
+        with open(path, 'rb') as f:                 # let the yaml reader detect the encoding of bytes
+            yaml = _yaml()                          # libyaml's CSafeLoader is preferred
+            config = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+        _db_config_cache[path] = (signature, config)
+        if len(_db_config_cache) > _db_config_cache_size:
+            _db_config_cache.popitem(last=False)
+    _db_config_cache.move_to_end(path)
+    return copy.copy(config)
 
 
 class DBProxy(object):
@@ -114,6 +255,11 @@ class DBProxy(object):
         """
 
         self._cursor = None
+        self._own_cursor = None                     # never handed to callers, see `._get_cursor()`
+        self._pool_key = None
+        self._connect_kwargs = None
+        self._ansi_quotes = False
+        self._packet_size = None
         if connection:
             self._connection = connection                                     # binding connection
             self._driver = driver or BasicConfig.driver
@@ -130,26 +276,55 @@ class DBProxy(object):
                 self._connect_kwargs = config[db_label]['connect_kwargs']
             else:
                 raise TypeError('Unexpected data type in argument "db_config"')
-            self._connection = connect(self._driver, **self._connect_kwargs)  # binding connection
+            self._connection, self._pool_key = _acquire(self._driver, self._connect_kwargs)  # binding connection
         self.writer = None                                                    # for loading data to database
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """commit if successful otherwise rollback"""
-        self.connection.rollback() if exc_type else self.connection.commit()
+        """commit if successful otherwise rollback, nothing is done if the proxy was closed in the block"""
+        connection = self._connection
+        if connection is None:
+            return False
+        connection.rollback() if exc_type else connection.commit()
         self.close()
         return False
 
-    def fromdb(self, select_stmt, args=None, latency=True):
+    def fromdb(self, select_stmt, args=None, latency=True, fetch_size=None, cursorclass=None):
         """argument `select_stmt` and `args` will be passed to the underlying API `cursor.execute()`.
         fetch and wrap all data immediately if the argument `latency` is `False`
+        if the argument `fetch_size` is present, rows are streamed by a server-side cursor (pymysql/MySQLdb)
+            and fetched `fetch_size` rows at a time instead of being buffered in client memory.
+        the argument `cursorclass` is passed to `connection.cursor()` if it's present,
+            e.g. `pymysql.cursors.SSCursor` streams rows without `fetch_size`.
+        """
+        petl = _petl()
+        if cursorclass is not None:
+            cursor_factory = functools.partial(self.connection.cursor, cursorclass)
+        else:
+            cursor_factory = self._streaming_cursor
+        if fetch_size:
+            temp = petl.wrap(_FetchingView(cursor_factory, select_stmt, args, fetch_size))
+        elif cursorclass is not None:
+            temp = petl.fromdb(cursor_factory, select_stmt, args)
+        else:
+            temp = petl.fromdb(self.connection, select_stmt, args)
+        return temp if latency else petl.wrap(list(temp))
+
+    def fromdb_tuples(self, select_stmt, args=None, fetch_size=1000):
+        """execute `select_stmt` on a server-side cursor (pymysql/MySQLdb) without any petl wrapping.
+        :return (header, rows), `rows` is an iterator of row tuples fetched `fetch_size` at a time.
+            the cursor stays open on the connection until `rows` is exhausted or `rows.close()` is called.
+            `.todb(itertools.chain([header], rows), ...)` skips dicts and petl tables but still loads every row into
+            memory before writing, `.copy()` streams a query result into a table without holding it in memory.
         """
-        temp = petl.fromdb(self.connection, select_stmt, args)
-        return temp if latency else petl.wrap([row for row in temp])
+        rows = iter(_FetchingView(self._streaming_cursor, select_stmt, args, fetch_size))
+        header = next(rows)
+        return header, rows
 
-    def todb(self, table, table_name, mode='insert', batch_size=128, unique_key=()):
+    def todb(self, table, table_name, mode='insert', batch_size=128, unique_key=(), batch_commit=False,
+             disable_checks=False, parallelism=1):
         """
         :param table: a `petl.util.base.Table` or a sequence like this:
             [header, row1, row2, ...] or [row1, row2, ...]
@@ -162,45 +337,223 @@ class DBProxy(object):
                 if `mode` equal to 'truncate'.
             execute SQL INSERT INTO Statement before attempting to automatically create a database table which requires
               `SQLAlchemy <http://www.sqlalchemy.org/>` to be installed if `mode` equal to 'create'
+            execute SQL LOAD DATA LOCAL INFILE Statement with a temporary tab-separated file if `mode` equal to 'bulk',
+              the MySQL connection must be made with `local_infile=True`.
         :param batch_size: The `table` will be sliced into many sub-tables with `batch_size`, batch execute sub-table.
+            'auto' sizes sub-tables to about 80% of MySQL's `max_allowed_packet`, 128 is used for other drivers.
         :param unique_key: it must be present if the argument `mode` is 'update', otherwise it will be ignored.
+        :param batch_commit: 1 transaction for 1 sub-table if it's True, 1 transaction for every N sub-tables if it's
+            an integer N, otherwise the whole `table` is loaded in a single transaction which is rolled back on error.
+        :param disable_checks: turn off MySQL's `unique_checks` and `foreign_key_checks` of the session while loading,
+            the previous values are restored afterwards.
+        :param parallelism: number of threads which execute sub-tables concurrently, each on its own connection with
+            the parameters of `db_config`, rows are no longer written in order if it's greater than 1. The load is not
+            atomic then: every thread commits on its own, the rows of the other threads stay committed if one fails.
         """
         mode = mode.upper()
         if mode == 'CREATE':
-            import petl
-            cursor = self.connection.cursor()
-            cursor.execute("SET SQL_MODE=ANSI_QUOTES")
-            return petl.todb(table, cursor, table_name, create=True, commit=True)
+            cursor = self._get_cursor()
+            if not self._ansi_quotes and self._is_mysql:
+                # once per session, petl quotes names with '"', the previous mode is restored by `.close()`
+                cursor.execute("SET @dbman_sql_mode=@@SESSION.sql_mode, SQL_MODE=ANSI_QUOTES")
+                self._ansi_quotes = True
+            return _petl().todb(table, cursor, table_name, create=True, commit=True)
         if mode == 'TRUNCATE':
-            self.cursor().execute("TRUNCATE TABLE %s;" % table_name)
+            self._get_cursor().execute("TRUNCATE TABLE %s;" % _quote_table_name(table_name))
             mode = 'INSERT'
         kwargs = {
             'connection': self.connection,
             'table': table,
             'table_name': table_name,
             'batch_size': batch_size,
-            'batch_commit': False,
+            'batch_commit': batch_commit,
         }
-        if (mode == 'UPDATE') and self._driver and ('MYSQL' in self._driver.upper()):
-            self.writer = _MySQLUpdating(unique_key=unique_key, **kwargs)
+        if self.writer is not None:
+            self.writer.close()
+        self.writer = self._make_writer(mode, unique_key, parallelism, **kwargs)
+        if batch_size == 'auto' and mode != 'BULK':    # the bulk writer sends all rows as one file
+            self.writer.fit_batch_size(self._max_allowed_packet())
+        disable_checks = disable_checks and self._is_mysql
+        if parallelism > 1:
+            assert self._connect_kwargs is not None, 'argument parallelism requires a proxy connected via db_config'
+            return self.writer.write_parallel(self._acquire_another, parallelism, disable_checks)
+        if not disable_checks:
+            return self.writer.write()
+        with _checks_disabled(self._get_cursor()):
+            return self.writer.write()
+
+    def copy(self, select_stmt, table_name, target, args=None, mode='insert', unique_key=(), fetch_size=1000):
+        """stream the result of `select_stmt` into the table `table_name` of the proxy `target`, `fetch_size` rows
+        are fetched from a server-side cursor (pymysql/MySQLdb) and written per round trip, the whole result set is
+        never held in memory. `target` should be bound to another connection than this proxy.
+        :param mode: 'insert', 'replace' or 'update', see `.todb()`
+        :return the number of affected rows
+        """
+        mode = mode.upper()
+        if mode not in ('INSERT', 'REPLACE', 'UPDATE'):
+            raise AssertionError('The mode "%s" can not be used to copy' % mode)
+        cursor = self._streaming_cursor()
+        try:
+            cursor.execute(select_stmt, args)
+            header = tuple(d[0] for d in cursor.description)
+            writer = target._make_writer(mode, unique_key, 1, connection=target.connection, table=[header],
+                                         table_name=table_name, batch_size=fetch_size, batch_commit=False)
+            try:
+                return writer.write_batches(_fetch_batches(cursor, fetch_size))
+            finally:
+                writer.close()
+        finally:
+            cursor.close()
+
+    def _make_writer(self, mode, unique_key, parallelism, **kwargs):
+        if (mode == 'UPDATE') and self._is_mysql:
+            return _MySQLUpdating(unique_key=unique_key, **kwargs)
         elif mode == 'INSERT':
-            self.writer = _InsertingWriter(**kwargs)
+            return _InsertingWriter(**kwargs)
         elif mode == 'REPLACE':
-            self.writer = _MySQLReplacing(**kwargs)
-        else:
-            raise AssertionError('The driver "%s" can not handle this mode "%s"' % (self._driver, mode))
-        return self.writer.write()
+            return _MySQLReplacing(**kwargs)
+        elif (mode == 'BULK') and self._is_mysql:
+            assert parallelism == 1, 'argument parallelism must be 1 if mode is "bulk"'
+            return _MySQLBulkLoading(**kwargs)
+        raise AssertionError('The driver "%s" can not handle this mode "%s"' % (self._driver, mode))
 
     @property
     def connection(self):
         return self._connection
 
+    @property
+    def _is_mysql(self):
+        return bool(self._driver) and ('MYSQL' in self._driver.upper())
+
     def cursor(self, **kwargs):
+        """factory method that creates a new cursor object on every call"""
         self._cursor = self.connection.cursor(**kwargs)
         return self._cursor
 
+    def _get_cursor(self):
+        """the cursor for the proxy's own statements, it's opened on first use and never returned by `.cursor()`"""
+        if self._own_cursor is None:
+            self._own_cursor = self.connection.cursor()
+        return self._own_cursor
+
+    def _max_allowed_packet(self):
+        """MySQL's `max_allowed_packet` of the bound connection, `None` for other drivers"""
+        if self._packet_size is None and self._is_mysql:
+            cursor = self.connection.cursor()
+            cursor.execute("SHOW VARIABLES LIKE 'max_allowed_packet'")
+            self._packet_size = int(cursor.fetchone()[1])
+            cursor.close()
+        return self._packet_size
+
+    def _acquire_another(self):
+        """obtain another connection with the parameters of the bound one, :return (connection, pool key)"""
+        return _acquire(self._driver, self._connect_kwargs)
+
+    def _streaming_cursor(self):
+        """a cursor that leaves the result set on the server if the driver supports it"""
+        if self._driver in ('pymysql', 'MySQLdb'):
+            return self.connection.cursor(_load_driver(self._driver + '.cursors').SSCursor)
+        return self.connection.cursor()
+
     def close(self):
-        self._connection.close()
+        """close the bound connection, or return it to the pool if it was taken from one,
+        the session is left as it was acquired and cursors of this proxy are closed before it's pooled.
+        calling it again does nothing, the proxy is unbound from the connection.
+        """
+        if self._connection is None:
+            return
+        pool_key = self._pool_key
+        if self.writer is not None:
+            self.writer.close()
+        if self._ansi_quotes and pool_key is not None:
+            try:
+                self._get_cursor().execute("SET SESSION sql_mode=@dbman_sql_mode")
+            except Exception:                       # each driver raises its own error class
+                pool_key = None                     # do not pool a connection in an unknown sql_mode
+        for cursor in (self._cursor, self._own_cursor):
+            if cursor is not None:
+                cursor.close()
+        _release(pool_key, self._connection)
+        self._pool_key = None
+        self._connection = None
+
+
+Proxy = DBProxy                                     # the name used by README and earlier releases
+
+
+class _FetchingView(object):
+    """an iterable over a query result which fetches `fetch_size` rows per round trip, header row first"""
+
+    def __init__(self, cursor_factory, select_stmt, args, fetch_size):
+        self.cursor_factory = cursor_factory
+        self.select_stmt = select_stmt
+        self.args = args
+        self.fetch_size = fetch_size
+
+    def __iter__(self):
+        cursor = self.cursor_factory()
+        try:
+            cursor.execute(self.select_stmt, self.args)
+            yield tuple(d[0] for d in cursor.description)
+            for rows in _fetch_batches(cursor, self.fetch_size):
+                for row in rows:
+                    yield row
+        finally:
+            cursor.close()
+
+
+def _fetch_batches(cursor, fetch_size):
+    """yield the remaining rows of an executed cursor `fetch_size` rows at a time"""
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def _quote_table_name(table_name):
+    """quote a table name like 'foo' or 'schema.foo' with backticks"""
+    if '.' in table_name:
+        tu = table_name.split('.')
+        ss = "`%s`.`%s`" % (tu[0], tu[1])
+    else:
+        ss = "`%s`" % table_name
+    return ss.replace('``', '`')
+
+
+@contextlib.contextmanager
+def _manual_commit(connection):
+    """turn off autocommit of a pymysql/MySQLdb connection within the block, so that a transaction covers a whole
+    sub-table rather than every single statement, the previous mode is restored afterwards.
+    """
+    get_autocommit = getattr(connection, 'get_autocommit', None)
+    if get_autocommit is None or not get_autocommit():
+        yield
+        return
+    connection.autocommit(False)
+    try:
+        yield
+    finally:
+        connection.autocommit(True)
+
+
+@contextlib.contextmanager
+def _checks_disabled(cursor):
+    """turn off MySQL's `unique_checks` and `foreign_key_checks` of the cursor's session within the block,
+    the previous values are restored afterwards.
+    """
+    cursor.execute("SET @dbman_unique_checks=@@unique_checks, @dbman_foreign_key_checks=@@foreign_key_checks, "
+                   "unique_checks=0, foreign_key_checks=0")
+    try:
+        yield
+    finally:
+        cursor.execute("SET unique_checks=@dbman_unique_checks, foreign_key_checks=@dbman_foreign_key_checks")
+
+
+@functools.lru_cache(maxsize=256)
+def _build_query_fmt(prefix, table_name_q, fields_q, values_f, postfix, items_q):
+    """equal query formats are the same string object across writers"""
+    return "%s %s(%s) VALUES (%s) %s %s" % (prefix, table_name_q, fields_q, values_f, postfix, items_q)
 
 
 class WriterInterface(object):
@@ -214,75 +567,121 @@ class WriterInterface(object):
         self.table_name = table_name
         self.batch_size = batch_size
         self.batch_commit = batch_commit
-        if isinstance(table, petl.util.base.Table):
-            self.table = table
+        if not isinstance(table, (list, tuple)):   # a `petl.util.base.Table` or other iterable yielding header first
+            it = iter(table)                        # iterate the table only once
+            header = next(it, ())
+            rows = list(it)
+        elif len(table) == 0:
+            header, rows = (), []
+        elif isinstance(table[0], dict):
+            header = tuple(dict.fromkeys(itertools.chain.from_iterable(table)))  # keys in order of appearance
+            rows = [tuple(dic.get(k) for k in header) for dic in table]
         else:
-            if len(table) > 0:
-                if isinstance(table[0], dict):
-                    table = petl.wrap(petl.fromdicts(table))
-                else:
-                    table = petl.wrap(table)
-            else:
-                table = petl.empty()
+            header, rows = table[0], table[1:]      # [header, row1, row2, ...] is used as it is
         self.table = table
-        self.header = self.table.header()
-        self.row_count = self.table.nrows()
+        self.header = tuple(header)
+        self._rows = rows
+        self.row_count = len(self._rows)
+        self._fields_sql = self._fields_q()
+        self._values_sql = self._values_f()
+        self._sql_fmt = self._make_query_fmt()
         self._cursor = None
 
     def write(self):
-        self._cursor = cursor = self.connection.cursor()
-        sql_fmt = self._make_query_fmt()
+        if not self.row_count:
+            return 0
+        return self.write_batches(self.__slice_table())
+
+    def write_batches(self, sub_tables):
+        """execute the query format for every sub-table of the iterable `sub_tables`, whose rows match `.header`"""
+        return self._execute(self.connection, self._get_cursor(), sub_tables)
+
+    def _execute(self, connection, cursor, sub_tables):
+        """commit every `batch_commit` sub-tables (`True` means 1) and at the end, rollback if an error occurs"""
+        commit_every = int(self.batch_commit)
+        sql_fmt, executemany, commit = self._sql_fmt, cursor.executemany, connection.commit
         affected_row_count = 0
-        for sub_table in self.__slice_table():
-            num = cursor.executemany(sql_fmt, sub_table)
-            affected_row_count += (num or 0)
-            if self.batch_commit:
-                self.connection.commit()
-        self.connection.commit()
+        with _manual_commit(connection):
+            try:
+                for i, sub_table in enumerate(sub_tables, 1):
+                    num = executemany(sql_fmt, sub_table)
+                    affected_row_count += (num or 0)
+                    if commit_every and (i % commit_every == 0):
+                        commit()
+                commit()
+            except Exception:
+                connection.rollback()
+                raise
         return affected_row_count
 
+    def write_parallel(self, acquire, parallelism, disable_checks=False):
+        """distribute sub-tables over `parallelism` threads, each thread writes on its own connection and commits
+        on its own, so the rows of the other threads stay committed if one thread fails.
+        :param acquire: a callable which returns a tuple (connection, pool key), see `_acquire()`
+        :param disable_checks: turn off MySQL's `unique_checks` and `foreign_key_checks` of every thread's session
+        """
+        groups = [[] for _ in range(parallelism)]
+        for i, sub_table in enumerate(self.__slice_table()):
+            groups[i % parallelism].append(sub_table)
+
+        def write_group(sub_tables):
+            connection, key = acquire()
+            try:
+                cursor = connection.cursor()
+                try:
+                    if not disable_checks:
+                        return self._execute(connection, cursor, sub_tables)
+                    with _checks_disabled(cursor):
+                        return self._execute(connection, cursor, sub_tables)
+                finally:
+                    cursor.close()
+            finally:
+                _release(key, connection)
+
+        with concurrent.futures.ThreadPoolExecutor(parallelism) as executor:
+            return sum(executor.map(write_group, [group for group in groups if group]))
+
+    def fit_batch_size(self, packet_size):
+        """estimate `batch_size` from the width of the first row so that a batch fills about 80% of `packet_size`"""
+        if not packet_size or not self.row_count:
+            self.batch_size = 128
+            return
+        row_bytes = sum(len(repr(v)) + 2 for v in self._rows[0]) + 2
+        self.batch_size = max(32, min(10000, int(0.8 * packet_size / row_bytes)))
+
+    def close(self):
+        """close the cursor used for writing"""
+        if self._cursor is not None:
+            self._cursor.close()
+
+    def _get_cursor(self):
+        """the cursor used for writing, it's opened on first use"""
+        if self._cursor is None:
+            self._cursor = self.connection.cursor()
+        return self._cursor
+
     def make_sql(self):
         """:return collections.Iterable<unicode>, where unicode is a valid SQL Statement"""
-        for row in self.table.dicts():
-            yield "%s %s(%s) VALUES (%s) %s %s" % (
-                self.PREFIX,
-                self._table_name_q(),
-                self._fields_q(row.keys()),
-                ', '.join(map(self._to_q, row.values())),
-                self.POSTFIX,
-                self._items_q(),
-            )
+        to_q = self._to_q
+        for row in self._rows:
+            yield self._sql_fmt % tuple(to_q(v) for v in row)
 
     def _make_query_fmt(self):
-        return "%s %s(%s) VALUES (%s) %s %s" % (
+        return _build_query_fmt(
             self.PREFIX,
             self._table_name_q(),
-            self._fields_q(),
-            self._values_f(),
+            self._fields_sql,
+            self._values_sql,
             self.POSTFIX,
             self._items_q(),
         )
 
     def __slice_table(self):
-        if self.row_count <= self.batch_size:
-            yield self.table[1:]
-            return
-
-        for loop_count in range(self.row_count // self.batch_size + 1):
-            left = loop_count * self.batch_size + 1
-            right = (loop_count + 1) * self.batch_size + 1
-            if left > self.row_count:
-                return
-            yield self.table[left:right]
+        for left in range(0, self.row_count, self.batch_size):
+            yield self._rows[left:left + self.batch_size]
 
     def _table_name_q(self):
-        table_name = self.table_name
-        if '.' in table_name:
-            tu = table_name.split('.')
-            ss = "`%s`.`%s`" % (tu[0], tu[1])
-        else:
-            ss = "`%s`" % table_name
-        return ss.replace('``', '`')
+        return _quote_table_name(self.table_name)
 
     def _fields_q(self, header=None):
         return ', '.join(["`%s`" % f for f in header or self.header]).replace('%', '%%')
@@ -294,6 +693,9 @@ class WriterInterface(object):
         return ''
 
     def _to_q(self, obj):
+        to_literal = _sql_literals.get(type(obj))
+        if to_literal is not None:
+            return to_literal(obj)
         if obj is None:
             sql = 'NULL'
         elif isinstance(obj, numbers.Number):
@@ -319,9 +721,61 @@ class _MySQLUpdating(WriterInterface):
     POSTFIX = 'ON DUPLICATE KEY UPDATE'
 
     def __init__(self, connection, table, table_name, batch_size, batch_commit, unique_key):
-        super(_MySQLUpdating, self).__init__(connection, table, table_name, batch_size, batch_commit)
-        self.unique_key = unique_key
         assert unique_key, 'argument unique_key must be specified'
+        if isinstance(unique_key, str):
+            unique_key = (unique_key,)
+        self.unique_key = frozenset(unique_key)     # required by `._items_q()` while building the query format
+        super(_MySQLUpdating, self).__init__(connection, table, table_name, batch_size, batch_commit)
 
     def _items_q(self):
         return ', '.join(("`%s`=VALUES(`%s`)" % (f, f) for f in self.header if f not in self.unique_key))
+
+
+class _MySQLBulkLoading(WriterInterface):
+    """write all rows to a temporary tab-separated file and send it by LOAD DATA LOCAL INFILE"""
+
+    def _make_query_fmt(self):
+        return ("LOAD DATA LOCAL INFILE %%s INTO TABLE %s CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' (%s)"
+                % (self._table_name_q(), self._fields_sql))
+
+    def write(self):
+        if not self.row_count:
+            return 0
+        f = tempfile.NamedTemporaryFile('wb', suffix='.tsv', delete=False)
+        try:
+            with f:
+                for row in self._rows:
+                    f.write(b'\t'.join(map(self._to_tsv, row)))
+                    f.write(b'\n')
+            connection = self.connection
+            with _manual_commit(connection):
+                try:
+                    affected_row_count = self._get_cursor().execute(self._sql_fmt, (f.name,))
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+        finally:
+            os.remove(f.name)
+        return affected_row_count or 0
+
+    def write_batches(self, sub_tables):
+        raise NotImplementedError('%s sends all rows as one file, use `.write()`' % self.__class__.__name__)
+
+    def make_sql(self):
+        """rows are sent as a file, there is no SQL statement per row"""
+        return iter(())
+
+    @staticmethod
+    def _to_tsv(obj):
+        """encode a value as the driver binds it: bool as 1/0, bytes as they are, others by `str()` in UTF-8"""
+        if obj is None:
+            return b'\\N'
+        if isinstance(obj, bool):
+            return b'1' if obj else b'0'
+        if isinstance(obj, (bytes, bytearray)):
+            data = bytes(obj)
+        else:
+            data = str(obj).encode('utf-8')
+        return data.replace(b'\\', b'\\\\').replace(b'\t', b'\\t').replace(b'\n', b'\\n')